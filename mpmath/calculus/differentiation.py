@@ -21,43 +21,61 @@ def difference(ctx, s, n):
         \Delta^n = \sum_{k=0}^{\infty} (-1)^{k+n} {n \choose k} s_k.
     """
     n = int(n)
-    d = ctx.zero
-    b = (-1) ** (n & 1)
+    weights = []
+    # Unsigned binomial coefficients with alternating sign
+    c = 1
+    sign = (-1) ** (n & 1)
     for k in xrange(n+1):
-        d += b * s[k]
-        b = (b * (k-n)) // (k+1)
-    return d
+        weights.append(sign * c)
+        sign = -sign
+        c = c * (n-k) // (k+1)
+    return ctx.fdot(weights, s[:n+1])
+
+def hstep(ctx, x, prec, **options):
+    h = options.get('h')
+    if h is None:
+        if options.get('relative'):
+            hextramag = int(ctx.mag(x))
+        else:
+            hextramag = 0
+        addprec = options.get('addprec', 10)
+        h = ctx.ldexp(1, -prec-addprec-hextramag)
+    else:
+        h = ctx.convert(h)
+    direction = options.get('direction', 0)
+    if direction:
+        h *= ctx.sign(direction)
+    return h
+
+def hshift(ctx, x, prec, **options):
+    # Perturb x by half a step, avoiding evaluation exactly at x
+    addprec = options.get('addprec', 10)
+    orig = ctx.prec
+    try:
+        ctx.prec = 2*(prec+2*addprec)
+        # Halving is exact, also for a complex step
+        h = hstep(ctx, x, prec, **options) / 2
+    finally:
+        ctx.prec = orig
+    # Exact, since the working precision of the differences that
+    # follow (and for diffs, their number) is not known here
+    return ctx.fadd(x, h, exact=True)
 
 def hsteps(ctx, f, x, n, prec, **options):
-    singular = options.get('singular')
     addprec = options.get('addprec', 10)
-    direction = options.get('direction', 0)
     workprec = (prec+2*addprec) * (n+1)
     orig = ctx.prec
     try:
         ctx.prec = workprec
-        h = options.get('h')
-        if h is None:
-            if options.get('relative'):
-                hextramag = int(ctx.mag(x))
-            else:
-                hextramag = 0
-            h = ctx.ldexp(1, -prec-addprec-hextramag)
-        else:
-            h = ctx.convert(h)
+        h = hstep(ctx, x, prec, **options)
         # Directed: steps x, x+h, ... x+n*h
-        direction = options.get('direction', 0)
-        if direction:
-            h *= ctx.sign(direction)
+        if options.get('direction', 0):
             steps = xrange(n+1)
             norm = h
         # Central: steps x-n*h, x-(n-2)*h ..., x, ..., x+(n-2)*h, x+n*h
         else:
             steps = xrange(-n, n+1, 2)
             norm = (2*h)
-        # Perturb
-        if singular:
-            x += 0.5*h
         values = [f(x+k*h) for k in steps]
         return values, norm, workprec
     finally:
@@ -185,23 +203,29 @@ def diff(ctx, f, x, n=1, **options):
     prec = ctx.prec
     try:
         if method == 'step':
+            if options.get('singular'):
+                x = hshift(ctx, x, prec, **options)
             values, norm, workprec = hsteps(ctx, f, x, n, prec, **options)
             ctx.prec = workprec
-            v = ctx.difference(values, n) / norm**n
+            v = ctx.difference(values, n)
+            w = norm**n
         elif method == 'quad':
             ctx.prec += 10
             radius = ctx.convert(options.get('radius', 0.25))
-            def g(t):
-                rei = radius*ctx.expj(t)
-                z = x + rei
-                return f(z) / rei**n
+            x = ctx.convert(x)
+            # Bind as locals; g is evaluated at every quadrature node
+            def g(t, x=x, f=f, radius=radius, n=n, expj=ctx.expj):
+                rei = radius*expj(t)
+                return f(x + rei) / rei**n
             d = ctx.quadts(g, [0, 2*ctx.pi])
-            v = d * ctx.factorial(n) / (2*ctx.pi)
+            v = d * ctx.factorial(n)
+            w = 2*ctx.pi
         else:
             raise ValueError("unknown method: %r" % method)
     finally:
         ctx.prec = prec
-    return +v
+    # The final division rounds to the target precision
+    return v / w
 
 def _partial_diff(ctx, f, xs, orders, options):
     if not orders:
@@ -268,11 +292,11 @@ def diffs(ctx, f, x, n=None, **options):
             yield ctx.diff(f, x, k, **options)
             k += 1
         return
-    singular = options.get('singular')
-    if singular:
-        yield ctx.diff(f, x, 0, singular=True)
-    else:
-        yield f(ctx.convert(x))
+    x = ctx.convert(x)
+    if options.get('singular'):
+        # Perturb once for all blocks of finite differences
+        x = hshift(ctx, x, ctx.prec, **options)
+    yield f(x)
     if n < 1:
         return
     if n == ctx.inf:
@@ -282,13 +306,17 @@ def diffs(ctx, f, x, n=None, **options):
     while 1:
         callprec = ctx.prec
         y, norm, workprec = hsteps(ctx, f, x, B, callprec, **options)
-        for k in xrange(A, B):
-            try:
-                ctx.prec = workprec
-                d = ctx.difference(y, k) / norm**k
-            finally:
-                ctx.prec = callprec
-            yield +d
+        try:
+            ctx.prec = workprec
+            terms = []
+            w = norm**A
+            for k in xrange(A, B):
+                terms.append((ctx.difference(y, k), w))
+                w *= norm
+        finally:
+            ctx.prec = callprec
+        for k, (d, w) in zip(xrange(A, B), terms):
+            yield d / w
             if k >= n:
                 return
         A, B = B, int(A*1.4+1)
@@ -571,11 +599,17 @@ def taylor(ctx, f, x, n, **options):
         12.1824939607035
 
     """
-    gen = enumerate(ctx.diffs(f, x, n, **options))
-    if options.get("chop", True):
-        return [ctx.chop(d)/ctx.factorial(i) for i, d in gen]
-    else:
-        return [d/ctx.factorial(i) for i, d in gen]
+    chop = options.get("chop", True)
+    coeffs = []
+    # Build i! incrementally as an exact integer
+    fact = 1
+    for i, d in enumerate(ctx.diffs(f, x, n, **options)):
+        if i:
+            fact *= i
+        if chop:
+            d = ctx.chop(d)
+        coeffs.append(d/fact)
+    return coeffs
 
 @defun
 def pade(ctx, a, L, M):
@@ -629,18 +663,29 @@ def pade(ctx, a, L, M):
     # a[L]*q[1] + ... + a[L-M+1]*q[M] = -a[L+1]
     # ...
     # a[L+M-1]*q[1] + ... + a[L]*q[M] = -a[L+M]
-    A = ctx.matrix(M)
-    for j in range(M):
-        for i in range(min(M, L+j+1)):
-            A[j, i] = a[L+j-i]
-    v = -ctx.matrix(a[(L+1):(L+M+1)])
-    x = ctx.lu_solve(A, v)
+    if L == 0 and a[0]:
+        # The system is lower triangular with a[0] on the diagonal,
+        # so forward substitution replaces the LU decomposition
+        prec = ctx.prec
+        try:
+            ctx.prec += 10
+            a0 = ctx.convert(a[0])
+            x = []
+            for j in range(M):
+                s = -ctx.convert(a[j+1])
+                for i in range(j):
+                    s -= a[j-i]*x[i]
+                x.append(s / a0)
+        finally:
+            ctx.prec = prec
+    else:
+        A = ctx.matrix(M)
+        for j in range(M):
+            for i in range(min(M, L+j+1)):
+                A[j, i] = a[L+j-i]
+        v = -ctx.matrix(a[(L+1):(L+M+1)])
+        x = ctx.lu_solve(A, v)
     q = [ctx.one] + list(x)
-    # compute p
-    p = [0]*(L+1)
-    for i in range(L+1):
-        s = a[i]
-        for j in range(1, min(M,i) + 1):
-            s += q[j]*a[i-j]
-        p[i] = s
+    # compute p as the truncated convolution of a and q
+    p = [ctx.fdot(q[:min(M,i)+1], a[i::-1]) for i in range(L+1)]
     return p, q
@@ -295,13 +295,15 @@ class TanhSinh(QuadratureRule):
         abscissas from degree `m-1`. Thus reusing the result from
         the previous level allows a 2x speedup.
         """
-        h = self.ctx.mpf(2)**(-degree)
+        ctx = self.ctx
+        # Powers of two built directly; scaling by them is exact
+        h = ctx.ldexp(1, -degree)
         # Abscissas overlap, so reusing saves half of the time
         if previous:
-            S = previous[-1]/(h*2)
+            S = previous[-1]*ctx.ldexp(1, degree-1)
         else:
-            S = self.ctx.zero
-        S += self.ctx.fdot((w,f(x)) for (x,w) in nodes)
+            S = ctx.zero
+        S += ctx.fdot((w,f(x)) for (x,w) in nodes)
         return h*S
 
     def calc_nodes(self, degree, prec, verbose=False):
@@ -325,7 +327,11 @@ class TanhSinh(QuadratureRule):
         extra = 20
         ctx.prec += extra
         tol = ctx.ldexp(1, -prec-10)
-        pi4 = ctx.pi/4
+        pi2 = ctx.pi/2
+        # Since 1-x = 2/(e+1), stop once e exceeds 2/tol; the bound is
+        # capped by the working epsilon so that x stays below 1 in a
+        # fixed-precision context such as fp
+        emax = 2/max(tol, ctx.eps/4)
 
         # For simplicity, we work in steps h = 1/2^n, with the first point
         # offset so that we can reuse the sum from the previous degree
@@ -339,32 +345,33 @@ class TanhSinh(QuadratureRule):
             nodes.append((ctx.zero, ctx.pi/2))
             h = t0
         else:
-            h = t0*2
+            h = ctx.ldexp(1, 1-degree)
 
         # Since h is fixed, we can compute the next exponential
         # by simply multiplying by exp(h)
         expt0 = ctx.exp(t0)
-        a = pi4 * expt0
-        b = pi4 / expt0
+        a = pi2 * expt0
+        b = pi2 / expt0
         udelta = ctx.exp(h)
         urdelta = 1/udelta
 
-        for k in xrange(0, 20*2**degree+1):
+        for k in xrange(0, (20<<degree)+1):
             # Reference implementation:
             # t = t0 + k*h
             # x = tanh(pi/2 * sinh(t))
             # w = pi/2 * cosh(t) / cosh(pi/2 * sinh(t))**2
 
-            # Fast implementation. Note that c = exp(pi/2 * sinh(t))
-            c = ctx.exp(a-b)
-            d = 1/c
-            co = (c+d)/2
-            si = (c-d)/2
-            x = si / co
-            w = (a+b) / co**2
-            diff = abs(x-1)
-            if diff <= tol:
+            # Fast implementation. Note that e = exp(pi * sinh(t)) is
+            # the square of c = exp(pi/2 * sinh(t)), so that with
+            # q = 1/(e+1) we have x = (c-1/c)/(c+1/c) = 1-2*q and
+            # w = (a+b)/2 / ((c+1/c)/2)**2 = 2*(a+b)*e*q**2, using
+            # a single division
+            e = ctx.exp(a-b)
+            if e >= emax:
                 break
+            q = 1/(e+1)
+            x = 1-2*q
+            w = 2*(a+b)*e*q*q
 
             nodes.append((x, w))
             nodes.append((-x, w))
@@ -376,7 +383,7 @@ class TanhSinh(QuadratureRule):
                 # Note: the number displayed is rather arbitrary. Should
                 # figure out how to print something that looks more like a
                 # percentage
-                print("Calculating nodes:", ctx.nstr(-ctx.log(diff, 10) / prec))
+                print("Calculating nodes:", ctx.nstr(-ctx.log(2*q, 10) / prec))
 
         ctx.prec -= extra
         return nodes
@@ -412,13 +419,16 @@ class GaussLegendre(QuadratureRule):
         quadrature of degree of given degree (actually `3 \cdot 2^m`).
         """
         ctx = self.ctx
-        # It is important that the epsilon is set lower than the
-        # "real" epsilon
-        epsilon = ctx.ldexp(1, -prec-8)
         # Fairly high precision might be required for accurate
         # evaluation of the roots
         orig = ctx.prec
         ctx.prec = int(prec*1.5)
+        # The Newton iteration is done in fixed-point arithmetic with
+        # wp bits. It is important that the epsilon is set lower than
+        # the "real" epsilon
+        wp = ctx.prec + 20
+        one = 1 << wp
+        epsilon = 1 << (wp-prec-8)
         if degree == 1:
             x = ctx.mpf(3)/5
             w = ctx.mpf(5)/9
@@ -430,21 +440,32 @@ class GaussLegendre(QuadratureRule):
         upto = n//2 + 1
         for j in xrange(1, upto):
             # Asymptotic formula for the roots
-            r = ctx.mpf(math.cos(math.pi*(j-0.25)/(n+0.5)))
+            r = math.cos(math.pi*(j-0.25)/(n+0.5))
+            # Newton iteration in double precision first; this is much
+            # cheaper and leaves only a couple of steps to do below
+            for k in xrange(10):
+                t1, t2 = 1.0, 0.0
+                for j1 in xrange(1,n+1):
+                    t2, t1 = t1, ((2*j1-1)*r*t1 - (j1-1)*t2)/j1
+                a = t1*(r**2-1)/(n*(r*t1-t2))
+                r -= a
+                if abs(a) < 1e-15:
+                    break
+            r = ctx.to_fixed(ctx.mpf(r), wp)
             # Newton iteration
             while 1:
-                t1, t2 = 1, 0
+                t1, t2 = one, 0
                 # Evaluates the Legendre polynomial using its defining
                 # recurrence relation
                 for j1 in xrange(1,n+1):
-                    t3, t2, t1 = t2, t1, ((2*j1-1)*r*t1 - (j1-1)*t2)/j1
-                t4 = n*(r*t1- t2)/(r**2-1)
-                t5 = r
-                a = t1/t4
-                r = r - a
+                    t2, t1 = t1, ((((2*j1-1)*r*t1)>>wp) - (j1-1)*t2)//j1
+                t4 = (n*(((r*t1)>>wp) - t2) << wp) // (((r*r)>>wp) - one)
+                a = (t1 << wp) // t4
+                r -= a
                 if abs(a) < epsilon:
                     break
-            x = r
+            x = r = ctx.ldexp(r, -wp)
+            t4 = ctx.ldexp(t4, -wp)
             w = 2/((1-r**2)*t4**2)
             if verbose  and j % 30 == 15:
                 print("Computing nodes (%i of %i)" % (j, upto))
@@ -871,6 +892,17 @@ class QuadratureMethods(object):
             >>> cos(1)+si(1)-pi/2
             -0.0844109505595738
 
+        When `a = -\infty`, the series is summed over the zeros with
+        negative indices `x_{-1}, x_{-2}, \ldots`, so a function given as
+        *zeros* must also accept `n < 0`, returning zeros that decrease
+        towards `-\infty`. Over `[-\infty, \infty]`, the zeros with
+        positive and negative indices are both used::
+
+            >>> quadosc(lambda x: sin(x)/x, [-inf, 0], zeros=lambda n: n*pi)
+            1.5707963267949
+            >>> pi/2
+            1.5707963267949
+
         Of course, the integrand may contain a complex exponential just as
         well as a real sine or cosine::
 
@@ -904,6 +936,16 @@ class QuadratureMethods(object):
             >>> quadosc(j0, [0, inf], zeros=j0zero)
             1.0
 
+        The zeros only determine where the interval is split, so they
+        need not be accurate to full precision. An asymptotic formula
+        is just as good and avoids the root-finding; here the leading
+        terms of McMahon's expansion
+        `j_{0,n} \approx \beta + 1/(8\beta)`, `\beta = \pi(n-1/4)`::
+
+            >>> j0zero = lambda n: pi*(n-0.25) + 1/(8*pi*(n-0.25))
+            >>> quadosc(j0, [0, inf], zeros=j0zero)
+            1.0
+
         For an example where *zeros* becomes necessary, consider the
         complete Fresnel integrals
 
@@ -976,32 +1018,45 @@ class QuadratureMethods(object):
         if [omega, period, zeros].count(None) != 2:
             raise ValueError( \
                 "must specify exactly one of omega, period, zeros")
+        if not zeros:
+            if omega:
+                halfperiod = ctx.pi/omega
+            else:
+                halfperiod = period/2
+            zeros = lambda n: n*halfperiod
         if a == ctx.ninf and b == ctx.inf:
-            s1 = ctx.quadosc(f, [a, 0], omega=omega, zeros=zeros, period=period)
-            s2 = ctx.quadosc(f, [0, b], omega=omega, zeros=zeros, period=period)
+            s1 = ctx.quadosc(f, [a, 0], zeros=zeros)
+            s2 = ctx.quadosc(f, [0, b], zeros=zeros)
             return s1 + s2
         if a == ctx.ninf:
-            if zeros:
-                return ctx.quadosc(lambda x:f(-x), [-b,-a], lambda n: zeros(-n))
-            else:
-                return ctx.quadosc(lambda x:f(-x), [-b,-a], omega=omega, period=period)
-        if b != ctx.inf:
+            # Sum the series from b towards -inf, i.e. over the zeros
+            # with negative indices, by integrating each term backwards
+            # and flipping the sign of the result
+            a, direction = b, -1
+        elif b == ctx.inf:
+            direction = 1
+        else:
             raise ValueError("quadosc requires an infinite integration interval")
-        if not zeros:
-            if omega:
-                period = 2*ctx.pi/omega
-            zeros = lambda n: n*period/2
         #for n in range(1,10):
         #    p = zeros(n)
         #    if p > a:
         #        break
         #if n >= 9:
         #    raise ValueError("zeros do not appear to be correctly indexed")
+        # Each zero is an endpoint of two consecutive terms; remember
+        # them since zeros may be expensive (e.g. using findroot)
+        cache = {}
+        def zero(k):
+            if k not in cache:
+                cache[k] = zeros(direction*k)
+            return cache[k]
         n = 1
-        s = ctx.quadgl(f, [a, zeros(n)])
+        s = ctx.quadgl(f, [a, zero(n)])
         def term(k):
-            return ctx.quadgl(f, [zeros(k), zeros(k+1)])
+            return ctx.quadgl(f, [zero(k), zero(k+1)])
         s += ctx.nsum(term, [n, ctx.inf])
+        if direction == -1:
+            s = -s
         return s
 
 if __name__ == '__main__':
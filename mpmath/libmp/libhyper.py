@@ -20,13 +20,13 @@ from .libmpf import (\
     mpf_sign, mpf_add, mpf_abs, mpf_pos,
     mpf_cmp, mpf_lt, mpf_le, mpf_gt, mpf_min_max,
     mpf_perturb, mpf_neg, mpf_shift, mpf_sub, mpf_mul, mpf_div,
-    sqrt_fixed, mpf_sqrt, mpf_rdiv_int, mpf_pow_int,
+    mpf_sqrt, mpf_rdiv_int, mpf_pow_int,
     to_rational,
 )
 
 from .libelefun import (\
-    mpf_pi, mpf_exp, mpf_log, pi_fixed, mpf_cos_sin, mpf_cos, mpf_sin,
-    mpf_sqrt, agm_fixed,
+    mpf_pi, mpf_exp, mpf_log, mpf_cos_sin, mpf_cos, mpf_sin,
+    mpf_sqrt, agm_fixed, sqrtpi_fixed,
 )
 
 from .libmpc import (\
@@ -61,6 +61,10 @@ TODO:
 
 """
 
+# The termination test |PRE| < 2^epsshift is cheapest as a bit length
+# comparison, if the integer type supports it (gmpy 1.x does not)
+have_bit_length = hasattr(MPZ_ONE, 'bit_length')
+
 def make_hyp_summator(key):
     """
     Returns a function that sums a generalized hypergeometric series,
@@ -90,9 +94,12 @@ def make_hyp_summator(key):
     bcomplex = []
 
     #add("wp = prec + 40")
-    add("MAX = kwargs.get('maxterms', wp*100)")
-    add("HIGH = MPZ_ONE<<epsshift")
-    add("LOW = -HIGH")
+    # maxterms may be a float, an mpf or infinite; an infinite value
+    # runs to the former fixed bound of 10**8 terms
+    add("MAX = int(min(kwargs.get('maxterms', wp*100), 10**8-2))")
+    if not have_bit_length:
+        add("HIGH = MPZ_ONE<<epsshift")
+        add("LOW = -HIGH")
 
     # Setup code
     add("SRE = PRE = one = (MPZ_ONE << wp)")
@@ -119,6 +126,9 @@ def make_hyp_summator(key):
         add("    ZIM = ym << offset")
         add("else:")
         add("    ZIM = ym >> (-offset)")
+        # For multiplying by z using three real multiplications
+        add("ZSUM = ZRE + ZIM")
+        add("ZDIF = ZIM - ZRE")
 
     for i, flag in enumerate(param_types):
         W = ["A", "B"][i >= p]
@@ -164,8 +174,9 @@ def make_hyp_summator(key):
     noncancellable_real_num = areal[cancellable_real:]
     noncancellable_real_den = breal[cancellable_real:]
 
-    # LOOP
-    add("for n in xrange(1,10**8):")
+    # LOOP; running out of terms is detected by the else clause
+    # rather than by testing n against MAX in every iteration
+    add("for n in xrange(1,MAX+2):")
 
     add("    if n in magnitude_check:")
     add("        p_mag = bitcount(abs(PRE))")
@@ -173,14 +184,26 @@ def make_hyp_summator(key):
         add("        p_mag = max(p_mag, bitcount(abs(PIM)))")
     add("        magnitude_check[n] = wp-p_mag")
 
-    # Real factors
-    multiplier = " * ".join(["AINT_#".replace("#", str(i)) for i in aint] + \
-                            ["AP_#".replace("#", str(i)) for i in arat] + \
-                            ["BQ_#".replace("#", str(i)) for i in brat])
-
-    divisor    = " * ".join(["BINT_#".replace("#", str(i)) for i in bint] + \
-                            ["BP_#".replace("#", str(i)) for i in brat] + \
-                            ["AQ_#".replace("#", str(i)) for i in arat] + ["n"])
+    # Real factors, multiplied as a balanced tree so that the operands
+    # of each multiplication have similar sizes
+    def product(factors):
+        if len(factors) < 3:
+            return " * ".join(factors)
+        m = len(factors) // 2
+        parts = []
+        for t in (product(factors[:m]), product(factors[m:])):
+            if "*" in t:
+                t = "(%s)" % t
+            parts.append(t)
+        return " * ".join(parts)
+
+    multiplier = product(["AINT_#".replace("#", str(i)) for i in aint] + \
+                         ["AP_#".replace("#", str(i)) for i in arat] + \
+                         ["BQ_#".replace("#", str(i)) for i in brat])
+
+    divisor    = product(["BINT_#".replace("#", str(i)) for i in bint] + \
+                         ["BP_#".replace("#", str(i)) for i in brat] + \
+                         ["AQ_#".replace("#", str(i)) for i in arat] + ["n"])
 
     if multiplier:
         add("    mul = " + multiplier)
@@ -206,19 +229,19 @@ def make_hyp_summator(key):
         for i in noncancellable_real_num: add("    PIM = (PIM * AREAL_#) >> wp".replace("#", str(i)))
         for i in noncancellable_real_den: add("    PIM = (PIM << wp) // BREAL_#".replace("#", str(i)))
 
+        # Shift back to wp bits before dividing, so that the division
+        # acts on wp-bit rather than 2*wp-bit numbers
         if multiplier:
             if have_complex_arg:
-                add("    PRE, PIM = (mul*(PRE*ZRE-PIM*ZIM))//div, (mul*(PIM*ZRE+PRE*ZIM))//div")
-                add("    PRE >>= wp")
-                add("    PIM >>= wp")
+                add("    U = ZRE*(PRE+PIM)")
+                add("    PRE, PIM = ((mul*(U-PIM*ZSUM))>>wp)//div, ((mul*(U+PRE*ZDIF))>>wp)//div")
             else:
                 add("    PRE = ((mul * PRE * ZRE) >> wp) // div")
                 add("    PIM = ((mul * PIM * ZRE) >> wp) // div")
         else:
             if have_complex_arg:
-                add("    PRE, PIM = (PRE*ZRE-PIM*ZIM)//div, (PIM*ZRE+PRE*ZIM)//div")
-                add("    PRE >>= wp")
-                add("    PIM >>= wp")
+                add("    U = ZRE*(PRE+PIM)")
+                add("    PRE, PIM = ((U-PIM*ZSUM)>>wp)//div, ((U+PRE*ZDIF)>>wp)//div")
             else:
                 add("    PRE = ((PRE * ZRE) >> wp) // div")
                 add("    PIM = ((PIM * ZRE) >> wp) // div")
@@ -248,19 +271,22 @@ def make_hyp_summator(key):
     if have_complex:
         add("    SRE += PRE")
         add("    SIM += PIM")
-        add("    if (HIGH > PRE > LOW) and (HIGH > PIM > LOW):")
+        if have_bit_length:
+            add("    if PRE.bit_length() <= epsshift and PIM.bit_length() <= epsshift:")
+        else:
+            add("    if (HIGH > PRE > LOW) and (HIGH > PIM > LOW):")
         add("        break")
     else:
         add("    SRE += PRE")
-        add("    if HIGH > PRE > LOW:")
+        if have_bit_length:
+            add("    if PRE.bit_length() <= epsshift:")
+        else:
+            add("    if HIGH > PRE > LOW:")
         add("        break")
 
     #add("    from mpmath import nprint, log, ldexp")
     #add("    nprint([n, log(abs(PRE),2), ldexp(PRE,-wp)])")
 
-    add("    if n > MAX:")
-    add("        raise NoConvergence('Hypergeometric series converges too slowly. Try increasing maxterms.')")
-
     # +1 all parameters for next loop
     for i in aint:     add("    AINT_# += 1".replace("#", str(i)))
     for i in bint:     add("    BINT_# += 1".replace("#", str(i)))
@@ -271,6 +297,9 @@ def make_hyp_summator(key):
     for i in acomplex: add("    ACRE_# += one".replace("#", str(i)))
     for i in bcomplex: add("    BCRE_# += one".replace("#", str(i)))
 
+    add("else:")
+    add("    raise NoConvergence('Hypergeometric series converges too slowly. Try increasing maxterms.')")
+
     if have_complex:
         add("a = from_man_exp(SRE, -wp, prec, 'n')")
         add("b = from_man_exp(SIM, -wp, prec, 'n')")
@@ -359,19 +388,30 @@ def mpf_erf(x, prec, rnd=round_fast):
     t = abs(to_fixed(x, wp))
     t2 = (t*t) >> wp
     s, term, k = t, 12345, 1
+    # d = 2*k+1
+    d = 3
+    # Two terms per iteration, so that the signs alternate without
+    # testing the parity of k
     while term:
         t = ((t * t2) >> wp) // k
-        term = t // (2*k+1)
-        if k & 1:
-            s -= term
-        else:
-            s += term
-        k += 1
-    s = (s << (wp+1)) // sqrt_fixed(pi_fixed(wp), wp)
+        term = t // d
+        s -= term
+        t = ((t * t2) >> wp) // (k+1)
+        term = t // (d+2)
+        s += term
+        k += 2
+        d += 4
+    s = (s << (wp+1)) // sqrtpi_fixed(wp)
     if sign:
         s = -s
     return from_man_exp(s, -wp, prec, rnd)
 
+# Division of a bignum by the bignum t in the erfc series is slow with
+# pure-Python integers, and cheaper done by multiplying with a reciprocal
+# computed once. GMP divides quickly when the quotient is short (as the
+# terms get small), so the reciprocal only pays off with the python backend.
+ERFC_RECIPROCAL = BACKEND == 'python'
+
 # If possible, we use the asymptotic series for erfc.
 # This is an alternating divergent asymptotic series, so
 # the error is at most equal to the first omitted term.
@@ -404,19 +444,33 @@ def mpf_erfc(x, prec, rnd=round_fast):
     s = term = MPZ_ONE << wp
     term_prev = 0
     t = (2 * to_fixed(x, wp) ** 2) >> wp
+    if ERFC_RECIPROCAL:
+        # 10 extra bits absorb the truncation error of the reciprocal
+        r = (MPZ_ONE << (2*wp+10)) // t
     k = 1
+    # d = 2*k-1
+    d = 1
+    # Two terms per iteration (k odd, then k+1 even)
     while 1:
-        term = ((term * (2*k - 1)) << wp) // t
+        if ERFC_RECIPROCAL:
+            term = (term * d * r) >> (wp+10)
+        else:
+            term = ((term * d) << wp) // t
         if k > 4 and term > term_prev or not term:
             break
-        if k & 1:
-            s -= term
+        s -= term
+        term_prev = term
+        if ERFC_RECIPROCAL:
+            term = (term * (d+2) * r) >> (wp+10)
         else:
-            s += term
+            term = ((term * (d+2)) << wp) // t
+        if k > 3 and term > term_prev or not term:
+            break
+        s += term
         term_prev = term
-        #print k, to_str(from_man_exp(term, -wp, 50), 10)
-        k += 1
-    s = (s << wp) // sqrt_fixed(pi_fixed(wp), wp)
+        k += 2
+        d += 4
+    s = (s << wp) // sqrtpi_fixed(wp)
     s = from_man_exp(s, -wp, wp)
     z = mpf_exp(mpf_neg(mpf_mul(x,x,wp),wp),wp)
     y = mpf_div(mpf_mul(z, s, wp), x, prec, rnd)
@@ -710,21 +764,31 @@ def mpf_expint(n, x, prec, rnd=round_fast, gamma=False):
     else:
         return re, None
 
-def mpf_ci_si_taylor(x, wp, which=0):
+def mpf_ci_si_taylor(x, wp, which=0, xf=None):
     """
     0 - Ci(x) - (euler+log(x))
     1 - Si(x)
+
+    If given, xf is x already converted to a fixed-point number.
     """
-    x = to_fixed(x, wp)
+    if xf is None:
+        x = to_fixed(x, wp)
+    else:
+        x = xf
     x2 = -(x*x) >> wp
     if which == 0:
         s, t, k = 0, (MPZ_ONE<<wp), 2
     else:
         s, t, k = x, x, 3
+    # f = k*(k-1), updated by differences
+    f = k*(k-1)
+    g = 4*k+2
     while t:
-        t = (t*x2//(k*(k-1)))>>wp
+        t = ((t*x2)>>wp)//f
         s += t//k
         k += 2
+        f += g
+        g += 8
     return from_man_exp(s, -wp)
 
 def mpc_ci_si_taylor(re, im, wp, which=0):
@@ -750,12 +814,20 @@ def mpc_ci_si_taylor(re, im, wp, which=0):
         sre, sim, tre, tim, k = 0, 0, (MPZ_ONE<<wp), 0, 2
     else:
         sre, sim, tre, tim, k = zre, zim, zre, zim, 3
+    # f = k*(k-1), updated by differences
+    f = k*(k-1)
+    g = 4*k+2
+    # Complex multiplication by z2 using three real multiplications
+    z2sum = z2re + z2im
+    z2dif = z2im - z2re
     while max(abs(tre), abs(tim)) > 2:
-        f = k*(k-1)
-        tre, tim = ((tre*z2re-tim*z2im)//f)>>wp, ((tre*z2im+tim*z2re)//f)>>wp
+        u = z2re*(tre+tim)
+        tre, tim = ((u-tim*z2sum)>>wp)//f, ((u+tre*z2dif)>>wp)//f
         sre += tre//k
         sim += tim//k
         k += 2
+        f += g
+        g += 8
     return from_man_exp(sre, -wp), from_man_exp(sim, -wp)
 
 def mpf_ci_si(x, prec, rnd=round_fast, which=2):
@@ -808,13 +880,16 @@ def mpf_ci_si(x, prec, rnd=round_fast, which=2):
         wp += abs(mag)
     # Use an asymptotic series? The smallest value of n!/x^n
     # occurs for n ~ x, where the magnitude is ~ exp(-x).
-    asymptotic = mag-1 > math.log(wp, 2)
+    # Since mag is an integer, mag-1 > log2(wp) is the same as
+    # mag > bitcount(wp).
+    asymptotic = mag > bitcount(wp)
     # Case 1: convergent series near 0
     if not asymptotic:
+        xf = to_fixed(x, wp)
         if which != 0:
-            si = mpf_pos(mpf_ci_si_taylor(x, wp, 1), prec, rnd)
+            si = mpf_pos(mpf_ci_si_taylor(x, wp, 1, xf), prec, rnd)
         if which != 1:
-            ci = mpf_ci_si_taylor(x, wp, 0)
+            ci = mpf_ci_si_taylor(x, wp, 0, xf)
             ci = mpf_add(ci, mpf_euler(wp), wp)
             ci = mpf_add(ci, mpf_log(mpf_abs(x), wp), prec, rnd)
         return ci, si
@@ -901,7 +976,7 @@ def mpc_si(z, prec, rnd=round_fast):
 # ratio x^2 / (-4*k*(k+n)). Hence, we only need one full-precision
 # multiplication and one division by a small integer per term.
 # The complex version is very similar, the only difference being
-# that the multiplication is actually 4 multiplies.
+# that the multiplication is actually 3 multiplies.
 
 # In the general case, we have
 # J_v(x) = (x/2)**v / v! * 0F1(v+1, (-1/4)*z**2)
@@ -921,16 +996,24 @@ def mpf_besseljn(n, x, prec, rounding=round_fast):
     if mag < 0:
         wp -= n * mag
     x = to_fixed(x, wp)
-    x2 = (x**2) >> wp
+    # Negated, so that the divisors below are positive
+    x2 = -((x**2) >> wp)
     if not n:
         s = t = MPZ_ONE << wp
     else:
-        s = t = (x**n // ifac(n)) >> ((n-1)*wp + n)
-    k = 1
+        # Shifting first gives the same result, but divides a wp-bit
+        # rather than an n*wp-bit number by n!
+        s = t = (x**n >> ((n-1)*wp + n)) // ifac(n)
+    # d = 4*k*(k+n) for k = 1, 2, ..., updated by differences
+    d = 4*(n+1)
+    g = 4*(n+3)
+    # With d > 0, shifting before dividing gives the same result
+    # and divides a wp-bit rather than a 2*wp-bit number
     while t:
-        t = ((t * x2) // (-4*k*(k+n))) >> wp
+        t = ((t * x2) >> wp) // d
         s += t
-        k += 1
+        d += g
+        g += 8
     if negate:
         s = -s
     return from_man_exp(s, -wp, prec, rounding)
@@ -946,24 +1029,31 @@ def mpc_besseljn(n, z, prec, rounding=round_fast):
         prec -= n * mag
     zre = to_fixed(zre, prec)
     zim = to_fixed(zim, prec)
-    z2re = (zre**2 - zim**2) >> prec
-    z2im = (zre*zim) >> (prec-1)
+    # Negated, so that the divisors below are positive
+    z2re = -((zre**2 - zim**2) >> prec)
+    z2im = -((zre*zim) >> (prec-1))
     if not n:
         sre = tre = MPZ_ONE << prec
         sim = tim = MPZ_ZERO
     else:
         re, im = complex_int_pow(zre, zim, n)
-        sre = tre = (re // ifac(n)) >> ((n-1)*prec + n)
-        sim = tim = (im // ifac(n)) >> ((n-1)*prec + n)
-    k = 1
+        sre = tre = (re >> ((n-1)*prec + n)) // ifac(n)
+        sim = tim = (im >> ((n-1)*prec + n)) // ifac(n)
+    # p = 4*k*(k+n) for k = 1, 2, ..., updated by differences
+    p = 4*(n+1)
+    g = 4*(n+3)
+    # Complex multiplication by z2 using three real multiplications
+    z2sum = z2re + z2im
+    z2dif = z2im - z2re
     while abs(tre) + abs(tim) > 3:
-        p = -4*k*(k+n)
-        tre, tim = tre*z2re - tim*z2im, tim*z2re + tre*z2im
-        tre = (tre // p) >> prec
-        tim = (tim // p) >> prec
+        u = z2re*(tre+tim)
+        tre, tim = u - tim*z2sum, u + tre*z2dif
+        tre = (tre >> prec) // p
+        tim = (tim >> prec) // p
         sre += tre
         sim += tim
-        k += 1
+        p += g
+        g += 8
     if negate:
         sre = -sre
         sim = -sim
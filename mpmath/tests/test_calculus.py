@@ -50,6 +50,19 @@ def test_pade():
     for x in arange(0, 1, 0.1):
         r = polyval(p[::-1], x)/polyval(q[::-1], x)
         assert(r.ae(exp(x), 1.0e-10))
+    # L = 0 uses forward substitution
+    p, q = pade(a, 0, 4)
+    A = matrix(4)
+    for j in range(4):
+        for i in range(j+1):
+            A[j,i] = a[j-i]
+    x = lu_solve(A, -matrix(a[1:5]))
+    assert p == [1]
+    for i in range(4):
+        assert q[i+1].ae(x[i])
+    for x in arange(0, 0.5, 0.1):
+        r = polyval(p[::-1], x)/polyval(q[::-1], x)
+        assert(r.ae(exp(x), 1.0e-3))
     mp.dps = 15
 
 def test_fourier():
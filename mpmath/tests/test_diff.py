@@ -22,6 +22,19 @@ def test_diffs():
     assert [chop(d) for d in diffs(sin, 0, 1, method='quad')] == [0, 1]
     assert [chop(d) for d in diffs(sin, 0, 2)] == [0, 1, 0]
     assert [chop(d) for d in diffs(sin, 0, 2, method='quad')] == [0, 1, 0]
+    f = lambda x: sin(x)/x
+    assert [chop(d) for d in diffs(f, 0, 1, singular=True)] == [1, 0]
+    assert diff(f, 0, 2, singular=True).ae(-mpf(1)/3)
+    assert list(diffs(f, 0, 2, singular=True))[2].ae(-mpf(1)/3)
+    # Complex step
+    assert chop(diff(f, 0, 1, singular=True, direction=1j)) == 0
+    assert diff(f, 0, 2, singular=True, direction=1j).ae(-mpf(1)/3)
+    assert list(diffs(f, 0, 2, singular=True, h=1e-10j))[2].ae(-mpf(1)/3)
+    # The perturbation must not be rounded away at a large point
+    X = mpf(2)**90
+    g = lambda x: sin(x-X)/(x-X)
+    assert diff(g, X, 2, singular=True).ae(-mpf(1)/3)
+    assert list(diffs(g, X, 2, singular=True))[2].ae(-mpf(1)/3)
 
 def test_taylor():
     mp.dps = 15
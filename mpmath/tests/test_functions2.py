@@ -1364,6 +1364,10 @@ def test_hyper_param_accuracy():
     assert hyp2f1(-5, 10, 3, 0.5, zeroprec=500) == 0
     assert (hyp1f1(-10000, 1000, 100)*10**424).ae(-3.1046080515824859974)
     assert (hyp2f1(1000,1.5,-3.5,-0.75,maxterms=100000)*10**231).ae(-4.0534790813913998643)
+    assert hyper([1,2],[3.5],0.5,maxterms=1e5).ae(1.43805509807655)
+    assert hyper([1,2],[3.5],0.5,maxterms=mpf(1e5)).ae(1.43805509807655)
+    assert hyper([1,2],[3.5],0.5,maxterms=inf).ae(1.43805509807655)
+    assert hyper([1,2],[3.5],0.5,maxterms=float('inf')).ae(1.43805509807655)
     assert legenp(2, 3, 0.25) == 0
     try:
         hypercomb(lambda a: [([],[],[],[],[a],[-a],0.5)], [3])
@@ -27,15 +27,31 @@ def test_quad_infinite_mirror():
     assert ae(quad(lambda x: exp(-x*x), [inf,-inf]), -sqrt(pi))
     assert ae(quad(lambda x: exp(x), [0,-inf]), -1)
 
+def test_quad_verbose():
+    from mpmath.calculus.quadrature import TanhSinh
+    # A fresh rule, so that the nodes are computed and the
+    # progress line at k = 150 is printed
+    mp.dps = 100
+    assert ae(quad(lambda x: 1/(1+x*x), [0, 1], method=TanhSinh,
+        verbose=True), pi/4)
+    mp.dps = 15
+
 def test_quadgl_linear():
     assert quadgl(lambda x: x, [0, 1], maxdegree=1).ae(0.5)
 
+def test_quadgl_fp():
+    # The node computation must terminate in double precision
+    assert ae(fp.quadgl(fp.sin, [0, fp.pi]), 2)
+
 def test_complex_integration():
     assert quadts(lambda x: x, [0, 1+j]).ae(j)
 
 def test_quadosc():
     mp.dps = 15
     assert quadosc(lambda x: sin(x)/x, [0, inf], period=2*pi).ae(pi/2)
+    assert quadosc(lambda x: sin(x)/x, [-inf, 0], zeros=lambda n: n*pi).ae(pi/2)
+    f = lambda x: cos(x)/(1+(x-1)**2)
+    assert quadosc(f, [-inf, inf], zeros=lambda n: (n+0.5)*pi).ae(pi*cos(1)/exp(1))
 
 # Double integrals
 def test_double_trivial():